@@ -1,8 +1,11 @@
+import asyncio
+import asyncpg
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any
 from data.gold.process import GoldLayerProcessor
 from fastapi.middleware.cors import CORSMiddleware
+from pgvector.asyncpg import register_vector
 
 app = FastAPI(title="Marketing Insights API",
              description="API for accessing marketing insights and content recommendations",
@@ -19,9 +22,29 @@ app.add_middleware(
 
 processor = GoldLayerProcessor()
 
+@app.on_event("startup")
+async def startup():
+    """Open the asyncpg pool shared by the search endpoints"""
+    # register_vector lets query embeddings travel as binary halfvec parameters
+    app.state.pool = await asyncpg.create_pool(
+        processor.db_uri,
+        min_size=5,
+        max_size=20,
+        init=register_vector
+    )
+    # Small silver tables are searched in process; larger ones stay on pgvector.
+    # The snapshot is taken once per API process, so restart after a silver refresh.
+    await asyncio.get_running_loop().run_in_executor(None, processor.load_in_memory_index)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the asyncpg pool"""
+    await app.state.pool.close()
+
 class QueryRequest(BaseModel):
     query: str
-    top_k: int = 10
+    # Bounded by the largest HNSW candidate list pgvector accepts
+    top_k: int = Field(10, ge=1, le=1000)
     engagement_threshold: float = 0.0
 
 class SearchResponse(BaseModel):
@@ -38,7 +61,8 @@ async def search_similar_posts(request: QueryRequest):
     Search for posts similar to the query text using semantic search
     """
     try:
-        results = processor.find_similar_posts(
+        results = await processor.find_similar_posts_async(
+            app.state.pool,
             query=request.query,
             top_k=request.top_k,
             engagement_threshold=request.engagement_threshold
@@ -53,7 +77,7 @@ async def get_marketing_insights(request: QueryRequest):
     Get marketing insights including high-value content and content gaps
     """
     try:
-        insights = processor.get_marketing_insights(request.query)
+        insights = await processor.get_marketing_insights_async(app.state.pool, request.query)
         return {"status": "success", "insights": insights}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
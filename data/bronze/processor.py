@@ -4,21 +4,24 @@ from datetime import datetime
 import numpy as np
 from ..models import BronzePost, SilverPost, SourceType
 
+# URLs and emojis/special characters (keeping basic punctuation), matched in one scan.
+# Both are replaced with a space; the whitespace collapse in clean_text absorbs it.
+_NOISE_RE = re.compile(r'https?://\S+|www\.\S+|[^\w\s.,!?-]')
+
 class BronzeToSilverProcessor:
     """Process raw social media posts from Bronze to Silver layer."""
     
-    def __init__(self, embedding_model):
+    def __init__(self, embedding_model, batch_size: int = 64):
         self.embedding_model = embedding_model
+        self.batch_size = batch_size
     
     def clean_text(self, text: str) -> str:
         """Clean and standardize text content."""
         if not text:
             return ""
         
-        # Remove URLs
-        text = re.sub(r'https?://\S+|www\.\S+', '', text)
-        # Remove emojis and special characters (keeping basic punctuation)
-        text = re.sub(r'[^\w\s.,!?-]', ' ', text)
+        # Remove URLs, emojis and special characters (keeping basic punctuation)
+        text = _NOISE_RE.sub(' ', text)
         # Convert to lowercase and remove extra whitespace
         text = ' '.join(text.lower().split())
         return text
@@ -27,31 +30,51 @@ class BronzeToSilverProcessor:
         """Calculate weighted engagement score."""
         return (0.2 * post.likes) + (0.3 * post.shares) + (0.5 * post.comments)
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate text embedding using the provided model."""
-        # This is a placeholder - in practice, you would call your embedding model here
-        # For example: return self.embedding_model.encode(text)
-        # For now, return a dummy 384-dim vector
-        return [0.0] * 384
+    def calculate_engagement_scores_batch(self, posts: List[BronzePost]) -> np.ndarray:
+        """Calculate weighted engagement scores for a batch of posts in one vectorized op."""
+        count = len(posts)
+        likes = np.fromiter((p.likes for p in posts), dtype=np.int64, count=count)
+        shares = np.fromiter((p.shares for p in posts), dtype=np.int64, count=count)
+        comments = np.fromiter((p.comments for p in posts), dtype=np.int64, count=count)
+        return (0.2 * likes) + (0.3 * shares) + (0.5 * comments)
     
-    def process_post(self, post: BronzePost) -> SilverPost:
-        """Process a single post from Bronze to Silver layer."""
-        cleaned_text = self.clean_text(post.post_text)
-        engagement_score = self.calculate_engagement_score(post)
-        embedding = self.generate_embedding(cleaned_text)
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate L2-normalized embeddings for a batch of texts in a single model call.
         
-        return SilverPost(
-            post_id=post.post_id,
-            post_text_cleaned=cleaned_text,
-            engagement_score=engagement_score,
-            post_embedding=embedding,
-            source_type=post.source_type,
-            created_at=post.created_at
+        Normalizing at ingestion makes cosine similarity a plain dot product downstream.
+        """
+        return self.embedding_model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
         )
     
+    def process_post(self, post: BronzePost) -> SilverPost:
+        """Process a single post from Bronze to Silver layer."""
+        return self.process_batch([post])[0]
+    
     def process_batch(self, posts: List[BronzePost]) -> List[SilverPost]:
-        """Process a batch of posts."""
-        return [self.process_post(post) for post in posts]
+        """Process a batch of posts, encoding all texts in one pass."""
+        if not posts:
+            return []
+        
+        cleaned = [self.clean_text(post.post_text) for post in posts]
+        engagement_scores = self.calculate_engagement_scores_batch(posts)
+        embeddings = self.generate_embeddings(cleaned)
+        
+        return [
+            SilverPost(
+                post_id=post.post_id,
+                post_text_cleaned=cleaned_text,
+                engagement_score=float(score),
+                post_embedding=embedding.tolist(),
+                source_type=post.source_type,
+                created_at=post.created_at
+            )
+            for post, cleaned_text, score, embedding in zip(posts, cleaned, engagement_scores, embeddings)
+        ]
     
     def deduplicate_posts(self, posts: List[SilverPost]) -> List[SilverPost]:
         """Remove duplicate posts based on post_id."""
@@ -72,13 +95,21 @@ class BronzeToSilverProcessor:
                 "schema_compliance": 1.0
             }
             
+        # Single pass over the posts; SilverPost already coerces embedding items
+        # to float, so checking the first element stands in for the full scan
+        seen_ids = set()
+        complete_posts = 0
+        valid_embeddings = 0
+        for p in posts:
+            if p.post_text_cleaned and p.post_text_cleaned.strip():
+                complete_posts += 1
+            seen_ids.add(p.post_id)
+            embedding = p.post_embedding
+            if isinstance(embedding, list) and len(embedding) == 384 and isinstance(embedding[0], float):
+                valid_embeddings += 1
+        
         total_posts = len(posts)
-        complete_posts = sum(1 for p in posts if p.post_text_cleaned.strip())
-        unique_posts = len({p.post_id for p in posts})
-        valid_embeddings = sum(1 for p in posts if 
-                             isinstance(p.post_embedding, list) and 
-                             len(p.post_embedding) == 384 and 
-                             all(isinstance(x, float) for x in p.post_embedding))
+        unique_posts = len(seen_ids)
         
         return {
             "completeness": complete_posts / total_posts,
@@ -1,20 +1,107 @@
 from typing import List, Dict, Any, Optional
+import asyncio
+import functools
+import re
+from collections import Counter
 import numpy as np
 import uuid
-from sqlalchemy import create_engine, text, Column, String, Float, JSON, DateTime
+from sqlalchemy import create_engine, event, text, Column, String, Float, JSON, DateTime
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.declarative import declarative_base
 from sentence_transformers import SentenceTransformer
+from pgvector import HalfVector
+from pgvector.psycopg2 import register_vector
 import logging
 from datetime import datetime
-import json
 from rich.console import Console
+from data.vector_search import ef_search_sql
 
 # Configure logging
 console = Console()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Topic extraction: words with 4+ chars, minus common English stopwords
+TOPIC_WORD_RE = re.compile(r'\b\w{4,}\b')
+TOPIC_STOPWORDS = frozenset({
+    'this', 'that', 'with', 'have', 'from', 'your', 'they', 'their', 'there',
+    'what', 'when', 'where', 'which', 'will', 'would', 'been', 'also'
+})
+
+# Largest silver table that load_in_memory_index will pull into process memory
+IN_MEMORY_MAX_ROWS = 20000
+
+# Similarity CTE shared by the sync and async searches. Placeholders are filled
+# in per driver below: SQLAlchemy :name binds, or asyncpg $n, where the query
+# vector is bound through the pgvector halfvec codec registered on the pool.
+SIMILAR_POSTS_SQL_TEMPLATE = """
+    WITH similarity_scores AS (
+        SELECT 
+            post_id,
+            post_text_cleaned,
+            engagement_score,
+            source_type,
+            created_at,
+            1 - (post_embedding <=> {embedding}) as cosine_similarity
+        FROM silver.social_posts_cleaned_features
+        WHERE engagement_score >= {engagement_threshold}
+        AND (1 - (post_embedding <=> {embedding})) >= {min_similarity}
+        ORDER BY post_embedding <=> {embedding}
+        LIMIT {limit}
+    )
+    SELECT 
+        post_id,
+        post_text_cleaned,
+        cosine_similarity,
+        engagement_score,
+        source_type,
+        created_at
+    FROM similarity_scores
+    WHERE cosine_similarity >= {min_similarity}
+    ORDER BY cosine_similarity DESC
+"""
+SIMILAR_POSTS_SQL = SIMILAR_POSTS_SQL_TEMPLATE.format(
+    embedding=":embedding", engagement_threshold=":engagement_threshold",
+    min_similarity=":min_similarity", limit=":top_k"
+)
+SIMILAR_POSTS_ASYNC_SQL = SIMILAR_POSTS_SQL_TEMPLATE.format(
+    embedding="$1", engagement_threshold="$2", min_similarity="$3", limit="$4"
+)
+
+# Similar posts bucketed into engagement quartiles in the same round-trip
+MARKETING_INSIGHTS_SQL_TEMPLATE = """
+    WITH similarity_scores AS (
+        SELECT 
+            post_id,
+            post_text_cleaned,
+            engagement_score,
+            source_type,
+            created_at,
+            1 - (post_embedding <=> {embedding}) as cosine_similarity
+        FROM silver.social_posts_cleaned_features
+        WHERE (1 - (post_embedding <=> {embedding})) >= {min_similarity}
+        ORDER BY post_embedding <=> {embedding}
+        LIMIT {limit}
+    )
+    SELECT 
+        post_id,
+        post_text_cleaned,
+        cosine_similarity,
+        engagement_score,
+        source_type,
+        created_at,
+        NTILE(4) OVER (ORDER BY engagement_score) as engagement_tile
+    FROM similarity_scores
+    ORDER BY cosine_similarity DESC
+"""
+MARKETING_INSIGHTS_SQL = MARKETING_INSIGHTS_SQL_TEMPLATE.format(
+    embedding=":embedding", min_similarity=":min_similarity", limit=":limit"
+)
+MARKETING_INSIGHTS_ASYNC_SQL = MARKETING_INSIGHTS_SQL_TEMPLATE.format(
+    embedding="$1", min_similarity="$2", limit="$3"
+)
+
 # Initialize SQLAlchemy
 Base = declarative_base()
 
@@ -31,7 +118,8 @@ class MarketingInsightsFact(Base):
     post_text_cleaned = Column(String)
     source_type = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
-    metadata = Column(JSON)  # For additional metadata
+    # 'metadata' is reserved on declarative classes, so map the column under another attribute
+    metadata_ = Column('metadata', JSON)  # For additional metadata
 
 class GoldLayerProcessor:
     """
@@ -46,12 +134,39 @@ class GoldLayerProcessor:
         Args:
             db_uri: Database connection string
         """
-        self.engine = create_engine(db_uri)
+        self.db_uri = db_uri
+        # Keep a warm pool shared across requests; pre-ping drops stale sockets
+        self.engine = create_engine(
+            db_uri,
+            pool_size=20,
+            max_overflow=40,
+            pool_pre_ping=True,
+            pool_recycle=1800
+        )
+        # Typed pgvector adapters: query vectors are bound directly, not stringified
+        event.listen(self.engine, "connect", self._register_vector_types)
         self.Session = sessionmaker(bind=self.engine)
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Per-instance LRU so repeated queries skip the transformer forward pass
+        self._encode_query_cached = functools.lru_cache(maxsize=2048)(self._encode_query)
+        
+        # Optional in-process copy of small silver tables (see load_in_memory_index)
+        self._emb_matrix: Optional[np.ndarray] = None
+        self._emb_engagement: Optional[np.ndarray] = None
+        self._emb_posts: List[Dict[str, Any]] = []
         
         # Initialize database schema
         self._init_db()
+        # Reconnect so every pooled connection sees the vector types created above
+        self.engine.dispose()
+    
+    @staticmethod
+    def _register_vector_types(dbapi_connection, connection_record):
+        """Register pgvector types on each new psycopg2 connection"""
+        try:
+            register_vector(dbapi_connection)
+        except Exception as e:
+            logger.warning(f"Could not register pgvector types: {e}")
     
     def _init_db(self):
         """Initialize database schema if it doesn't exist"""
@@ -67,24 +182,64 @@ class GoldLayerProcessor:
             except Exception as e:
                 logger.warning(f"Could not enable vector extension: {e}")
             
-            # Create tables
-            try:
-                Base.metadata.create_all(self.engine)
-                logger.info("Database schema initialized successfully")
-            except Exception as e:
-                logger.error(f"Error initializing database schema: {e}")
+            conn.commit()
+        
+        # ANN index so `<=>` ORDER BY ... LIMIT avoids a sequential scan
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("""
+                    CREATE INDEX IF NOT EXISTS silver_posts_emb_hnsw
+                    ON silver.social_posts_cleaned_features
+                    USING hnsw (post_embedding halfvec_cosine_ops)
+                    WITH (m = 16, ef_construction = 64)
+                """))
+        except Exception as e:
+            logger.warning(f"Could not create HNSW index on silver embeddings: {e}")
+        
+        # Create tables
+        try:
+            Base.metadata.create_all(self.engine)
+            logger.info("Database schema initialized successfully")
+        except Exception as e:
+            logger.error(f"Error initializing database schema: {e}")
+    
+    @staticmethod
+    def _row_to_post(row) -> Dict[str, Any]:
+        """Convert a similarity row (SQLAlchemy mapping or asyncpg Record) to the post dict the API returns"""
+        return {
+            'post_id': row['post_id'],
+            'post_text': row['post_text_cleaned'],
+            'similarity_score': float(row['cosine_similarity']),
+            'engagement_score': float(row['engagement_score']),
+            'source_type': row['source_type'],
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None
+        }
+    
+    def _encode_query(self, normalized_query: str) -> np.ndarray:
+        """Encode a normalized query; wrapped by an LRU cache in __init__"""
+        vector = self.model.encode(normalized_query, convert_to_numpy=True).astype(np.float32, copy=False)
+        vector.flags.writeable = False  # Shared by every cache hit
+        return vector
+    
+    def _query_vector(self, query: str) -> np.ndarray:
+        """Cached float32 embedding of a query, bound directly as a pgvector parameter"""
+        return self._encode_query_cached(' '.join(query.lower().split()))
     
     def generate_query_embedding(self, query: str) -> List[float]:
         """
         Generate embedding for a search query using the sentence transformer model.
         
+        Embeddings are cached by the whitespace-collapsed, lowercased query.
+        all-MiniLM-L6-v2 uses an uncased tokenizer, so the normalization does
+        not change the vector.
+        
         Args:
             query: The search query text
             
         Returns:
             List[float]: The 384-dimensional embedding vector
         """
-        return self.model.encode(query, convert_to_numpy=True).tolist()
+        return self._query_vector(query).tolist()
     
     def find_similar_posts(
         self, 
@@ -105,64 +260,171 @@ class GoldLayerProcessor:
         Returns:
             List of dictionaries containing post information and similarity scores
         """
-        query_embedding = self.generate_query_embedding(query)
+        query_embedding = self._query_vector(query)
+        
+        if self._emb_matrix is not None:
+            return self.find_similar_in_memory(
+                query_embedding,
+                top_k=top_k,
+                engagement_threshold=engagement_threshold,
+                min_similarity=min_similarity
+            )
         
         with self.engine.connect() as conn:
-            # Convert query_embedding to string format for SQL
-            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+            conn.execute(text(ef_search_sql(top_k)))
             
             # Execute the similarity search query
-            results = conn.execute(text("""
-                WITH similarity_scores AS (
-                    SELECT 
-                        post_id,
-                        post_text_cleaned,
-                        engagement_score,
-                        source_type,
-                        created_at,
-                        1 - (post_embedding <=> CAST(:embedding AS vector)) as cosine_similarity
-                    FROM silver.social_posts_cleaned_features
-                    WHERE engagement_score >= :engagement_threshold
-                    AND (1 - (post_embedding <=> CAST(:embedding AS vector))) >= :min_similarity
-                    ORDER BY post_embedding <=> CAST(:embedding AS vector)
-                    LIMIT :top_k
-                )
-                SELECT 
-                    gen_random_uuid() as id,
-                    post_id,
-                    post_text_cleaned,
-                    cosine_similarity,
-                    engagement_score,
-                    source_type,
-                    created_at
-                FROM similarity_scores
-                WHERE cosine_similarity >= :min_similarity
-                ORDER BY cosine_similarity DESC
-            "), {
-                'embedding': embedding_str,
-                'query_text': query,
+            results = conn.execute(text(SIMILAR_POSTS_SQL), {
+                'embedding': HalfVector(query_embedding),
                 'engagement_threshold': engagement_threshold,
                 'min_similarity': min_similarity,
                 'top_k': top_k
             })
             
-            # Convert results to list of dicts
-            columns = ['id', 'post_id', 'post_text_cleaned', 'cosine_similarity', 
-                     'engagement_score', 'source_type', 'created_at']
+            return [self._row_to_post(r) for r in results.mappings()]
+    
+    def load_in_memory_index(self, max_rows: int = IN_MEMORY_MAX_ROWS) -> bool:
+        """
+        Load the silver embeddings into memory when the table is small enough,
+        so find_similar_posts can skip the database round-trip.
+        
+        The copy is a snapshot; call this again after the silver layer is
+        refreshed.
+        
+        Args:
+            max_rows: Only load when the table has at most this many embedded rows
             
-            posts = []
-            for row in results:
-                post = dict(zip(columns, row))
-                posts.append({
-                    'post_id': post['post_id'],
-                    'post_text': post['post_text_cleaned'],
-                    'similarity_score': float(post['cosine_similarity']),
-                    'engagement_score': float(post['engagement_score']),
-                    'source_type': post['source_type'],
-                    'created_at': post['created_at'].isoformat() if post['created_at'] else None
-                })
+        Returns:
+            True if the in-memory index is active, False if pgvector is used
+        """
+        with self.engine.connect() as conn:
+            row_count = conn.execute(text("""
+                SELECT COUNT(*) FROM silver.social_posts_cleaned_features
+                WHERE post_embedding IS NOT NULL
+            """)).scalar()
+            
+            if row_count > max_rows:
+                self._emb_matrix = None
+                self._emb_engagement = None
+                self._emb_posts = []
+                logger.info(f"{row_count} silver posts exceed in-memory limit {max_rows}; using pgvector")
+                return False
+            
+            rows = conn.execute(text("""
+                SELECT post_id, post_text_cleaned, engagement_score, source_type,
+                       created_at, post_embedding
+                FROM silver.social_posts_cleaned_features
+                WHERE post_embedding IS NOT NULL
+            """)).mappings().all()
+        
+        matrix = np.array([r['post_embedding'].to_numpy() for r in rows], dtype=np.float32).reshape(len(rows), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        
+        # Rows are L2-normalized so cosine similarity is a single mat-vec product
+        self._emb_matrix = np.ascontiguousarray(matrix / norms)
+        self._emb_engagement = np.array([r['engagement_score'] or 0.0 for r in rows], dtype=np.float64)
+        self._emb_posts = [
+            {
+                'post_id': r['post_id'],
+                'post_text': r['post_text_cleaned'],
+                'source_type': r['source_type'],
+                'created_at': r['created_at'].isoformat() if r['created_at'] else None
+            }
+            for r in rows
+        ]
+        logger.info(f"Loaded {len(rows)} silver embeddings into memory")
+        return True
+    
+    def find_similar_in_memory(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 10,
+        engagement_threshold: float = 0.0,
+        min_similarity: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Brute-force cosine search over the in-memory embedding matrix.
+        
+        Args:
+            query_embedding: The 384-dimensional query vector
+            top_k: Maximum number of results to return
+            engagement_threshold: Minimum engagement score for posts to be included
+            min_similarity: Minimum cosine similarity score (0-1)
+            
+        Returns:
+            List of dictionaries containing post information and similarity scores
+        """
+        query_norm = np.sqrt(np.vdot(query_embedding, query_embedding))
+        if query_norm:
+            query_embedding = query_embedding / query_norm
+        
+        scores = self._emb_matrix @ query_embedding
+        candidates = np.flatnonzero((scores >= min_similarity) & (self._emb_engagement >= engagement_threshold))
+        
+        # Partial selection of the top_k candidates, then order just those
+        if top_k < candidates.size:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        
+        return [
+            {
+                'post_id': self._emb_posts[i]['post_id'],
+                'post_text': self._emb_posts[i]['post_text'],
+                'similarity_score': float(scores[i]),
+                'engagement_score': float(self._emb_engagement[i]),
+                'source_type': self._emb_posts[i]['source_type'],
+                'created_at': self._emb_posts[i]['created_at']
+            }
+            for i in candidates
+        ]
+    
+    async def find_similar_posts_async(
+        self,
+        pool,
+        query: str,
+        top_k: int = 10,
+        engagement_threshold: float = 0.0,
+        min_similarity: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of find_similar_posts backed by an asyncpg pool.
+        
+        The query embedding is computed in the default executor so the
+        event loop stays free while the model runs.
+        
+        Args:
+            pool: asyncpg connection pool
+            query: The search query text
+            top_k: Maximum number of results to return
+            engagement_threshold: Minimum engagement score for posts to be included
+            min_similarity: Minimum cosine similarity score (0-1)
             
-            return posts
+        Returns:
+            List of dictionaries containing post information and similarity scores
+        """
+        loop = asyncio.get_running_loop()
+        query_embedding = await loop.run_in_executor(None, self._query_vector, query)
+        
+        if self._emb_matrix is not None:
+            return self.find_similar_in_memory(
+                query_embedding,
+                top_k=top_k,
+                engagement_threshold=engagement_threshold,
+                min_similarity=min_similarity
+            )
+        
+        async with pool.acquire() as conn, conn.transaction():
+            await conn.execute(ef_search_sql(top_k))
+            records = await conn.fetch(
+                SIMILAR_POSTS_ASYNC_SQL,
+                query_embedding,
+                engagement_threshold,
+                min_similarity,
+                top_k
+            )
+        
+        return [self._row_to_post(r) for r in records]
     
     def get_marketing_insights(
         self, 
@@ -173,6 +435,9 @@ class GoldLayerProcessor:
         """
         Generate marketing insights including high-value content and content gaps.
         
+        Similar posts and their engagement quartile (NTILE) come back from a
+        single query, so the embedding is computed and the database hit once.
+        
         Args:
             query: The search query text
             top_k: Number of results to return for each category
@@ -181,15 +446,56 @@ class GoldLayerProcessor:
         Returns:
             Dictionary containing marketing insights
         """
-        # First, find all similar posts
-        similar_posts = self.find_similar_posts(
-            query=query,
-            top_k=top_k * 4,  # Get more posts to analyze
-            min_similarity=similarity_threshold
-        )
+        query_embedding = self._query_vector(query)
+        
+        with self.engine.connect() as conn:
+            conn.execute(text(ef_search_sql(top_k * 4)))
+            rows = conn.execute(text(MARKETING_INSIGHTS_SQL), {
+                'embedding': HalfVector(query_embedding),
+                'min_similarity': similarity_threshold,
+                'limit': top_k * 4  # Get more posts to analyze
+            }).mappings().all()
+        
+        return self._build_marketing_insights(query, rows, top_k)
+    
+    async def get_marketing_insights_async(
+        self,
+        pool,
+        query: str,
+        top_k: int = 10,
+        similarity_threshold: float = 0.8
+    ) -> Dict[str, Any]:
+        """Async variant of get_marketing_insights backed by an asyncpg pool"""
+        loop = asyncio.get_running_loop()
+        query_embedding = await loop.run_in_executor(None, self._query_vector, query)
+        
+        async with pool.acquire() as conn, conn.transaction():
+            await conn.execute(ef_search_sql(top_k * 4))
+            rows = await conn.fetch(
+                MARKETING_INSIGHTS_ASYNC_SQL,
+                query_embedding,
+                similarity_threshold,
+                top_k * 4
+            )
+        
+        return self._build_marketing_insights(query, rows, top_k)
+    
+    def _build_marketing_insights(self, query: str, rows, top_k: int) -> Dict[str, Any]:
+        """
+        Partition similarity rows into high-value content (top engagement
+        quartile) and content gaps (bottom quartile).
         
-        if not similar_posts:
+        Args:
+            query: The search query text
+            rows: Mapping-like rows ordered by similarity, with an engagement_tile column
+            top_k: Number of results to return for each category
+            
+        Returns:
+            Dictionary containing marketing insights
+        """
+        if not rows:
             return {
+                'query': query,
                 'high_value_content': [],
                 'content_gaps': [],
                 'top_performing_topics': [],
@@ -201,36 +507,43 @@ class GoldLayerProcessor:
                 }
             }
         
-        # Calculate engagement statistics
-        engagement_scores = [p['engagement_score'] for p in similar_posts]
-        avg_engagement = sum(engagement_scores) / len(engagement_scores)
-        max_engagement = max(engagement_scores)
-        
-        # Define thresholds (using quartiles)
-        import numpy as np
-        engagement_threshold_high = np.percentile(engagement_scores, 75)  # Top 25%
-        engagement_threshold_low = np.percentile(engagement_scores, 25)   # Bottom 25%
-        
-        # Categorize posts
+        similar_posts = []
         high_value = []
         content_gaps = []
         
-        for post in similar_posts:
-            if post['engagement_score'] >= engagement_threshold_high:
+        # Rows arrive sorted by similarity, so each bucket is already ranked
+        for row in rows:
+            post = self._row_to_post(row)
+            similar_posts.append(post)
+            
+            if row['engagement_tile'] == 4:
                 high_value.append(post)
-            elif post['engagement_score'] <= engagement_threshold_low:
+            elif row['engagement_tile'] == 1:
                 content_gaps.append(post)
         
-        # Limit to top_k results
-        high_value = sorted(high_value, key=lambda x: x['similarity_score'], reverse=True)[:top_k]
-        content_gaps = sorted(content_gaps, key=lambda x: x['similarity_score'], reverse=True)[:top_k]
+        # Calculate engagement statistics
+        engagement_scores = np.fromiter(
+            (p['engagement_score'] for p in similar_posts),
+            dtype=np.float64,
+            count=len(similar_posts)
+        )
+        avg_engagement = engagement_scores.mean()
+        max_engagement = engagement_scores.max()
+        
+        # Define thresholds (using quartiles); one O(n) partition serves both cutoffs
+        k25 = len(engagement_scores) // 4
+        k75 = 3 * len(engagement_scores) // 4
+        partitioned = np.partition(engagement_scores, [k25, k75])
+        engagement_threshold_high = partitioned[k75]  # Top 25%
+        engagement_threshold_low = partitioned[k25]   # Bottom 25%
         
         # Extract top performing topics (simplified example)
         top_topics = self._extract_top_topics(similar_posts)
         
         return {
-            'high_value_content': high_value,
-            'content_gaps': content_gaps,
+            'query': query,
+            'high_value_content': high_value[:top_k],
+            'content_gaps': content_gaps[:top_k],
             'top_performing_topics': top_topics,
             'engagement_metrics': {
                 'avg_engagement': float(avg_engagement),
@@ -251,36 +564,28 @@ class GoldLayerProcessor:
         Returns:
             List of topic dictionaries with name and score
         """
-        from collections import defaultdict
-        import re
-        
         # Simple word frequency analysis (in a real app, use proper topic modeling)
-        word_counts = defaultdict(int)
+        word_counts = Counter()
         
         for post in posts:
-            text = post.get('post_text', '').lower()
-            words = re.findall(r'\b\w{4,}\b', text)  # Only words with 4+ chars
-            
-            # Common English stopwords to exclude
-            stopwords = {'this', 'that', 'with', 'have', 'from', 'your', 'they', 'their', 'there',
-                        'what', 'when', 'where', 'which', 'will', 'would', 'been', 'also'}
-            
-            for word in words:
-                if word not in stopwords and not word.isdigit():
-                    word_counts[word] += 1
+            text = (post.get('post_text') or '').lower()
+            word_counts.update(
+                word for word in TOPIC_WORD_RE.findall(text)
+                if word not in TOPIC_STOPWORDS and not word.isdigit()
+            )
         
         # Get top N words by frequency
-        sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
+        top_words = word_counts.most_common(top_n)
         
         # Convert to list of dicts with normalized scores
-        max_count = sorted_words[0][1] if sorted_words else 1
-        topics = []
-        
-        for word, count in sorted_words[:top_n]:
-            topics.append({
+        max_count = top_words[0][1] if top_words else 1
+        topics = [
+            {
                 'topic': word,
                 'score': count / max_count  # Normalize to 0-1
-            })
+            }
+            for word, count in top_words
+        ]
         
         return topics
     
@@ -292,45 +597,47 @@ class GoldLayerProcessor:
             insights: Dictionary containing marketing insights
             query: The original search query
         """
+        created_at = datetime.utcnow()
+        rows = [
+            {
+                'id': post.get('id', str(uuid.uuid4())),
+                'query_text': query,
+                'post_id': post['post_id'],
+                'cosine_similarity_score': post['similarity_score'],
+                'engagement_score': post['engagement_score'],
+                'post_text_cleaned': post.get('post_text'),
+                'source_type': post.get('source_type'),
+                'created_at': created_at,
+                'metadata': {
+                    'insight_type': insight_type,
+                    'created_at': created_at.isoformat()
+                }
+            }
+            for insight_type, key in (('high_value', 'high_value_content'), ('content_gap', 'content_gaps'))
+            for post in insights.get(key, [])
+        ]
+        
+        if not rows:
+            return
+        
+        # One multi-row upsert instead of a SELECT + INSERT/UPDATE per insight
+        table = MarketingInsightsFact.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                column.name: stmt.excluded[column.name]
+                for column in table.columns
+                if column.name not in ('id', 'created_at')
+            }
+        )
+        
         session = self.Session()
         
         try:
-            # Save high-value content
-            for post in insights.get('high_value_content', []):
-                insight = MarketingInsightsFact(
-                    id=post.get('id', str(uuid.uuid4())),
-                    query_text=query,
-                    post_id=post['post_id'],
-                    cosine_similarity_score=post['similarity_score'],
-                    engagement_score=post['engagement_score'],
-                    post_text_cleaned=post.get('post_text'),
-                    source_type=post.get('source_type'),
-                    metadata={
-                        'insight_type': 'high_value',
-                        'created_at': datetime.utcnow().isoformat()
-                    }
-                )
-                session.merge(insight)
-            
-            # Save content gaps
-            for post in insights.get('content_gaps', []):
-                insight = MarketingInsightsFact(
-                    id=post.get('id', str(uuid.uuid4())),
-                    query_text=query,
-                    post_id=post['post_id'],
-                    cosine_similarity_score=post['similarity_score'],
-                    engagement_score=post['engagement_score'],
-                    post_text_cleaned=post.get('post_text'),
-                    source_type=post.get('source_type'),
-                    metadata={
-                        'insight_type': 'content_gap',
-                        'created_at': datetime.utcnow().isoformat()
-                    }
-                )
-                session.merge(insight)
-            
+            session.execute(stmt)
             session.commit()
-            logger.info(f"Saved {len(insights.get('high_value_content', [])) + len(insights.get('content_gaps', []))} insights to database")
+            logger.info(f"Saved {len(rows)} insights to database")
             
         except Exception as e:
             session.rollback()
@@ -339,26 +646,3 @@ class GoldLayerProcessor:
             
         finally:
             session.close()
-
-    def get_marketing_insights(self, query: str) -> Dict[str, Any]:
-        """Get marketing insights for a given query"""
-        # Find top performing content
-        high_value = self.find_similar_posts(
-            query, 
-            top_k=10,
-            engagement_threshold=0.75  # Top quartile threshold
-        )
-        
-        # Find content gaps (high similarity but low engagement)
-        content_gaps = self.find_similar_posts(
-            query,
-            top_k=10,
-            engagement_threshold=0.0
-        )
-        content_gaps = [p for p in content_gaps if p['engagement_score'] < 0.25]  # Bottom quartile
-        
-        return {
-            "query": query,
-            "high_value_content": high_value,
-            "content_gaps": content_gaps
-        }
@@ -1,4 +1,7 @@
+import asyncio
+import functools
 import logging
+import aiohttp
 from pathlib import Path
 import yaml
 import time
@@ -11,6 +14,12 @@ logger = logging.getLogger(__name__)
 CONFIG_PATH = Path(__file__).parent / "config" / "companies.yaml"
 TIMESTAMP_FILE = Path(__file__).parent.parent.parent / ".last_ingest.txt"
 
+# Scraped posts are streamed through a bounded queue and written in micro-batches
+QUEUE_MAXSIZE = 1000
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 5.0  # seconds without new posts before a partial batch is written
+_DONE = object()
+
 def load_config():
     with open(CONFIG_PATH) as f:
         data = yaml.safe_load(f)
@@ -31,6 +40,72 @@ def save_ingest_time():
     """Save the current ingestion timestamp"""
     TIMESTAMP_FILE.write_text(str(int(time.time())))
 
+async def _enqueue(queue: asyncio.Queue, posts) -> None:
+    """Scraper page callback: stream one page of posts into the write queue"""
+    for post in posts:
+        await queue.put(post)
+
+async def _write_batches(queue: asyncio.Queue) -> int:
+    """Drain the queue into bronze in micro-batches until the sentinel arrives"""
+    inserted = 0
+    batch = []
+    
+    async def flush():
+        nonlocal inserted
+        if batch:
+            await asyncio.to_thread(upsert_bronze_posts, list(batch))
+            inserted += len(batch)
+            batch.clear()
+    
+    while True:
+        try:
+            post = await asyncio.wait_for(queue.get(), timeout=FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            # Scrapers are idle; don't hold a partial batch back
+            await flush()
+            continue
+        
+        if post is _DONE:
+            break
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+    
+    await flush()
+    return inserted
+
+async def ingest(companies, last_ingest: datetime) -> int:
+    """Scrape every company concurrently while a background task writes to bronze"""
+    queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+    
+    # Scrapers hand over each page as soon as it is parsed, so posts reach the
+    # writer while other pages are still downloading and the full queue applies
+    # backpressure to the scrapers
+    on_page = functools.partial(_enqueue, queue)
+    
+    async def scrape_all(session: aiohttp.ClientSession):
+        producers = []
+        for comp in companies:
+            name = comp["name"]
+            logger.info(f"Scraping {name}...")
+            producers.append(scrape_twitter(
+                comp.get("twitter_keywords", name), name, since_date=last_ingest, session=session, on_page=on_page
+            ))
+            producers.append(scrape_reddit(
+                name, comp.get("reddit_subreddits", []), limit_per_sub=100, since_date=last_ingest,
+                session=session, on_page=on_page
+            ))
+        
+        try:
+            await asyncio.gather(*producers)
+        finally:
+            await queue.put(_DONE)
+    
+    # One session for the whole run so connections to each host are reused
+    async with aiohttp.ClientSession() as session:
+        _, inserted = await asyncio.gather(scrape_all(session), _write_batches(queue))
+    return inserted
+
 def main():
     companies = load_config()
     if not companies:
@@ -40,16 +115,9 @@ def main():
     last_ingest = get_last_ingest_time()
     logger.info(f"Delta ingestion: fetching posts since {last_ingest.strftime('%Y-%m-%d %H:%M')}")
 
-    all_posts = []
-    for comp in companies:
-        name = comp["name"]
-        logger.info(f"Scraping {name}...")
-        all_posts.extend(scrape_twitter(comp.get("twitter_keywords", name), name, since_date=last_ingest))
-        all_posts.extend(scrape_reddit(name, comp.get("reddit_subreddits", []), limit_per_sub=100, since_date=last_ingest))
-
-    if all_posts:
-        upsert_bronze_posts(all_posts)
-        logger.info(f"Inserted {len(all_posts)} posts")
+    inserted = asyncio.run(ingest(companies, last_ingest))
+    if inserted:
+        logger.info(f"Inserted {inserted} posts")
         save_ingest_time()
     else:
         logger.info("No new posts")
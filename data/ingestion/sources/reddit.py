@@ -1,153 +1,210 @@
+import asyncio
 import logging
-import time
-from typing import List, Dict
+import re
+import uuid
+from typing import Awaitable, Callable, List, Dict, Optional
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+from bs4 import SoupStrainer
+from data.ingestion.utils.scraping import bounded_text, client_session, find_first, parse_html, read_page
+from data.ingestion.utils.rate_limit import HOST_LIMITER
 
 logger = logging.getLogger(__name__)
 
-def scrape_reddit(company: str, subreddits: List[str], limit_per_sub: int = 100, since_date: datetime = None) -> List[Dict]:
+HEADERS = {
+    "User-Agent": "social-insights-bot/0.1 (educational non-commercial)"
+}
+MAX_CONCURRENT_REQUESTS = 5  # be nice
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+COMMENTS_HREF_RE = re.compile("/comments/")
+
+def _has_class_within(cls: str, parent_cls: str):
+    """find() predicate for the descendant selector `.{parent_cls} .{cls}`"""
+    return lambda tag: cls in tag.get("class", ()) and tag.find_parent(class_=parent_cls) is not None
+
+# Element lookups as find() keyword arguments, tried in priority order.
+# find() filters on tag name and attributes directly instead of evaluating CSS.
+POST_FINDERS = (
+    {"name": "div", "attrs": {"data-testid": "search-post-unit"}},
+    {"name": "div", "attrs": {"data-testid": "post-container"}},
+    {"name": "div", "class_": "thing"},
+    {"name": "article"},
+    {"name": "div", "attrs": {"data-adclicklocation": "media"}},
+)
+TITLE_FINDERS = (
+    {"name": "h3"},
+    {"name": "a", "class_": "title"},
+    {"name": "h1"},
+    {"attrs": {"data-testid": "post-title"}},
+    {"name": "a", "href": COMMENTS_HREF_RE},
+)
+AUTHOR_FINDERS = (
+    {"attrs": {"data-testid": "post-author-link"}},
+    {"name": "a", "class_": "author"},
+    {"name": _has_class_within("author", "tagline")},
+    {"name": "a", "href": re.compile("/u/")},
+    {"name": "a", "href": re.compile("/user/")},
+)
+# Anything matching `.midcol .score.unvoted` or `div.score.likes` is already
+# caught by `.score`, so those fallbacks are not listed
+SCORE_FINDERS = (
+    {"attrs": {"data-testid": "post-vote-score"}},
+    {"class_": "score"},
+)
+COMMENT_FINDERS = (
+    {"attrs": {"data-testid": "comment-count"}},
+    {"name": "a", "class_": "comments"},
+    {"name": _has_class_within("count", "comments")},
+)
+
+# Every post container selector above matches a div or an article; skipping the
+# rest (head, scripts, inline JSON, nav) keeps tree construction cheap
+POST_STRAINER = SoupStrainer(["div", "article"])
+
+def _parse_count(txt: str) -> int:
+    """Parse a Reddit count such as "42", "1,024", "1.2k" or "3m comments"."""
+    t = txt.strip().lower().replace(',', '')
+    if not t:
+        return 0
+    t = t.split()[0]
+    mult = 1
+    if t.endswith('k'):
+        mult, t = 1000, t[:-1]
+    elif t.endswith('m'):
+        mult, t = 1_000_000, t[:-1]
+    try:
+        return int(float(t) * mult)
+    except ValueError:
+        return 0
+
+def _parse_reddit_page(html: str, company: str, limit: int) -> List[Dict]:
+    """Extract up to `limit` posts from one Reddit search results page."""
     posts = []
-    headers = {
-        "User-Agent": "social-insights-bot/0.1 (educational non-commercial)"
-    }
+    # Posts from one page share a scrape timestamp
+    scraped_at = datetime.utcnow()
+    soup = parse_html(html, POST_STRAINER)
     
-    for subreddit in subreddits:
-        # Try both old.reddit.com and www.reddit.com
-        urls = [
+    found_posts = False
+    for kwargs in POST_FINDERS:
+        for post in soup.find_all(**kwargs):
+            title_el = find_first(post, TITLE_FINDERS)
+            if not title_el:
+                continue
+                
+            title = bounded_text(title_el)
+            if not title or len(title) < 10:
+                continue
+            
+            # Get link - prioritize comment links
+            link_el = post.find("a", href=COMMENTS_HREF_RE) or post.find("a", href=True)
+            link = link_el.get("href", "") if link_el else ""
+            if link and not link.startswith("http"):
+                link = "https://www.reddit.com" + link
+            
+            # Get author
+            author = "unknown"
+            auth_el = find_first(post, AUTHOR_FINDERS)
+            if auth_el:
+                author = auth_el.get_text(strip=True).replace("u/", "").replace("@", "")
+            
+            # Get engagement metrics (score, comments)
+            score = 0
+            comments = 0
+            
+            # Try to get score (upvotes)
+            score_el = find_first(post, SCORE_FINDERS)
+            if score_el:
+                score = _parse_count(score_el.get_text(strip=True))
+            
+            # Try to get comments count
+            comment_el = find_first(post, COMMENT_FINDERS)
+            if comment_el:
+                comments = _parse_count(comment_el.get_text(strip=True))
+            
+            posts.append({
+                "post_id": f"reddit_{post.get('data-fullname') or uuid.uuid4().hex}",
+                "company": company,
+                "platform": "reddit",
+                "author_username": author,
+                "content": title,
+                "posted_at": scraped_at,
+                "url": link,
+                "likes": score,  # Reddit upvotes
+                "shares": 0,     # Reddit doesn't have shares
+                "comments": comments,
+            })
+            
+            found_posts = True
+            if len(posts) >= limit:
+                break
+        
+        if found_posts:
+            break
+    
+    return posts
+
+async def scrape_reddit(company: str, subreddits: List[str], limit_per_sub: int = 100, since_date: datetime = None,
+                        session: Optional[aiohttp.ClientSession] = None,
+                        on_page: Optional[Callable[[List[Dict]], Awaitable[None]]] = None) -> List[Dict]:
+    """
+    Scrape each subreddit's search results for `company`.
+    
+    With `on_page`, every parsed page is awaited into it as soon as it is ready
+    and nothing is kept in the returned list; otherwise all posts are returned.
+    """
+    posts = []
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    loop = asyncio.get_running_loop()
+    
+    async def fetch(session: aiohttp.ClientSession, url: str) -> str:
+        # Wait for the host's slot before taking a semaphore slot, so one busy
+        # host doesn't hold up requests to the other
+        await HOST_LIMITER.wait(url)
+        async with sem, session.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT) as r:
+            r.raise_for_status()
+            return await read_page(r)
+    
+    async def scrape_subreddit(session: aiohttp.ClientSession, subreddit: str) -> int:
+        # Race old.reddit.com against www.reddit.com; the first page that yields
+        # posts wins and the other request is cancelled
+        urls = (
             f"https://old.reddit.com/r/{subreddit}/search?q={company}&restrict_sr=1&sort=new",
             f"https://www.reddit.com/r/{subreddit}/search?q={company}&restrict_sr=1&sort=new"
-        ]
-        
-        for url in urls:
-            try:
-                r = requests.get(url, headers=headers, timeout=10)
-                r.raise_for_status()
-                soup = BeautifulSoup(r.text, "html.parser")
-                
-                # Try multiple selectors for Reddit posts
-                post_selectors = [
-                    "div[data-testid='search-post-unit']",
-                    "div[data-testid='post-container']",
-                    "div.thing",
-                    "article",
-                    "div[data-adclicklocation='media']"
-                ]
-                
-                found_posts = False
-                for selector in post_selectors:
-                    for post in soup.select(selector):
-                        title_el = None
-                        # Try multiple title selectors
-                        title_selectors = [
-                            "h3",
-                            "a.title",
-                            "h1",
-                            "[data-testid='post-title']",
-                            "a[href*='/comments/']"
-                        ]
-                        
-                        for title_sel in title_selectors:
-                            title_el = post.select_one(title_sel)
-                            if title_el:
-                                break
-                        
-                        if not title_el:
-                            continue
-                            
-                        title = title_el.get_text(strip=True)
-                        if not title or len(title) < 10:
-                            continue
-                        
-                        # Get link - prioritize comment links
-                        link_el = post.find("a", href=lambda x: x and '/comments/' in x)
-                        if not link_el:
-                            link_el = post.find("a", href=True)
-                        link = link_el.get("href", "") if link_el else ""
-                        if link and not link.startswith("http"):
-                            link = "https://www.reddit.com" + link
-                        
-                        # Get author
-                        author = "unknown"
-                        author_selectors = [
-                            "[data-testid='post-author-link']",
-                            "a.author",
-                            ".tagline .author",
-                            "a[href*='/u/']",
-                            "a[href*='/user/']"
-                        ]
-                        for auth_sel in author_selectors:
-                            auth_el = post.select_one(auth_sel)
-                            if auth_el:
-                                author = auth_el.get_text(strip=True).replace("u/", "").replace("@", "")
-                                break
-                        
-                        # Get engagement metrics (score, comments)
-                        score = 0
-                        comments = 0
-                        
-                        # Try to get score (upvotes)
-                        score_selectors = [
-                            "[data-testid='post-vote-score']",
-                            ".score",
-                            ".midcol .score.unvoted",
-                            "div.score.likes"
-                        ]
-                        for score_sel in score_selectors:
-                            score_el = post.select_one(score_sel)
-                            if score_el:
-                                try:
-                                    score_text = score_el.get_text(strip=True).replace('k', '000').replace('m', '000000')
-                                    score = int(float(score_text))
-                                    break
-                                except:
-                                    pass
-                        
-                        # Try to get comments count
-                        comment_selectors = [
-                            "[data-testid='comment-count']",
-                            "a.comments",
-                            ".comments .count"
-                        ]
-                        for comment_sel in comment_selectors:
-                            comment_el = post.select_one(comment_sel)
-                            if comment_el:
-                                try:
-                                    comment_text = comment_el.get_text(strip=True).replace('k', '000').replace('m', '000000')
-                                    comments = int(float(comment_text))
-                                    break
-                                except:
-                                    pass
-                        
-                        posts.append({
-                            "post_id": f"reddit_{post.get('data-fullname', f'reddit_{len(posts)}_{int(time.time()*1e6)}')}",
-                            "company": company,
-                            "platform": "reddit",
-                            "author_username": author,
-                            "content": title[:2000],
-                            "posted_at": datetime.utcnow(),
-                            "url": link,
-                            "likes": score,  # Reddit upvotes
-                            "shares": 0,     # Reddit doesn't have shares
-                            "comments": comments,
-                        })
-                        
-                        found_posts = True
-                        if len(posts) >= limit_per_sub:
-                            break
+        )
+        tasks = {asyncio.ensure_future(fetch(session, url)): url for url in urls}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url = tasks[task]
+                    try:
+                        page = task.result()
+                    except Exception as e:
+                        logger.warning(f"Reddit scrape failed for r/{subreddit} with {url}: {e}")
+                        continue
                     
-                    if found_posts:
-                        break
-                        
-                if found_posts:
-                    break
+                    # BeautifulSoup parsing is CPU-bound; keep it off the event loop
+                    try:
+                        page_posts = await loop.run_in_executor(None, _parse_reddit_page, page, company, limit_per_sub)
+                    except Exception as e:
+                        logger.warning(f"Reddit parse failed for r/{subreddit} with {url}: {e}")
+                        continue
                     
-            except Exception as e:
-                logger.warning(f"Reddit scrape failed for r/{subreddit} with {url}: {e}")
-                continue
-        
-        time.sleep(2)  # be nice
+                    if page_posts:
+                        if on_page is not None:
+                            await on_page(page_posts)
+                        else:
+                            posts.extend(page_posts)
+                        return len(page_posts)
+            return 0
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async with client_session(session) as http:
+        counts = await asyncio.gather(*(scrape_subreddit(http, subreddit) for subreddit in subreddits))
     
-    logger.info(f"Scraped {len(posts)} Reddit posts for {company}")
+    logger.info(f"Scraped {sum(counts)} Reddit posts for {company}")
     return posts
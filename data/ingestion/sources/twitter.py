@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import time
-from typing import List, Dict
+import uuid
+from typing import Awaitable, Callable, List, Dict, Optional
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+from bs4 import SoupStrainer
+from data.ingestion.utils.scraping import bounded_text, client_session, find_first, parse_html, read_page
+from data.ingestion.utils.rate_limit import HOST_LIMITER
 from urllib.parse import quote_plus
 
 logger = logging.getLogger(__name__)
@@ -14,115 +18,183 @@ NITTER_INSTANCES = [
     "https://nitter.privacydev.net",
     "https://nitter.eu"
 ]
+HEADERS = {"User-Agent": "social-insights-bot/0.1"}
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=5)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=15)
+NITTER_CACHE_TTL = 300  # seconds to reuse a working instance before probing again
 
-def get_working_nitter() -> str:
-    for instance in NITTER_INSTANCES:
-        try:
-            r = requests.head(instance, timeout=5)
-            if r.status_code == 200:
-                return instance.rstrip("/")
-        except:
-            continue
+_nitter_cache = {"url": None, "ts": 0.0, "probe": None}
+
+# Tweet containers are always divs or articles; nothing outside them is read
+TWEET_STRAINER = SoupStrainer(["div", "article"])
+
+# Element lookups as find() keyword arguments, tried in priority order
+TWEET_FINDERS = (
+    {"name": "div", "class_": "tweet"},
+    {"name": "div", "class_": "timeline-item"},
+    {"name": "article"},
+    {"name": "div", "class_": "status"},
+)
+CONTENT_FINDERS = (
+    {"class_": "tweet-content"},
+    {"class_": "status-content"},
+    {"name": "div", "class_": "e-content"},
+    {"name": "p"},
+    {"class_": "tweet-text"},
+)
+# `span.username` would only ever match what `.username` already found
+AUTHOR_FINDERS = (
+    {"class_": "tweet-name"},
+    {"class_": "username"},
+    {"class_": "author"},
+    {"name": "strong", "class_": "fullname"},
+)
+TIME_FINDERS = (
+    {"class_": "time"},
+    {"name": "span", "class_": "tweet-date"},
+    {"name": "a", "class_": "tweet-link"},
+)
+
+async def _probe_nitter(session: aiohttp.ClientSession) -> str:
+    """Probe every nitter instance at once and return the first one to answer 200."""
+    async def probe(instance: str) -> str:
+        await HOST_LIMITER.wait(instance)
+        async with session.head(instance, headers=HEADERS, timeout=PROBE_TIMEOUT) as r:
+            if r.status != 200:
+                raise Exception(f"{instance} returned {r.status}")
+            return instance.rstrip("/")
+    
+    tasks = [asyncio.ensure_future(probe(instance)) for instance in NITTER_INSTANCES]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                url = await next_done
+            except Exception:
+                continue
+            _nitter_cache.update(url=url, ts=time.monotonic())
+            return url
+    finally:
+        for task in tasks:
+            task.cancel()
     raise Exception("All nitter instances down")
 
-def scrape_twitter(query: str, company: str, limit: int = 200, since_date: datetime = None) -> List[Dict]:
+async def get_working_nitter(session: aiohttp.ClientSession, ttl: float = NITTER_CACHE_TTL) -> str:
+    """
+    Return a nitter instance that answers 200, reusing the last one for `ttl`
+    seconds. Concurrent callers share a single in-flight probe round.
+    """
+    if _nitter_cache["url"] and time.monotonic() - _nitter_cache["ts"] < ttl:
+        return _nitter_cache["url"]
+    
+    probe = _nitter_cache["probe"]
+    if probe is None or probe.done() or probe.get_loop() is not asyncio.get_running_loop():
+        probe = asyncio.ensure_future(_probe_nitter(session))
+        _nitter_cache["probe"] = probe
+    # Shielded so one caller being cancelled doesn't cancel the probe for the rest
+    return await asyncio.shield(probe)
+
+def _parse_twitter_page(html: str, base: str, company: str, limit: int) -> List[Dict]:
+    """Extract up to `limit` tweets from one nitter search results page."""
     posts = []
-    try:
-        base = get_working_nitter()
-    except Exception as e:
-        logger.error(f"No working nitter instances: {e}")
-        return posts
+    # Posts from one page share a scrape timestamp
+    scraped_at = datetime.utcnow()
+    soup = parse_html(html, TWEET_STRAINER)
     
-    url = f"{base}/search?f=tweets&q={quote_plus(query)}&since=&until=&near="
-    headers = {"User-Agent": "social-insights-bot/0.1"}
+    found_tweets = False
+    for kwargs in TWEET_FINDERS:
+        for tweet in soup.find_all(**kwargs):
+            content_el = find_first(tweet, CONTENT_FINDERS)
+            if not content_el:
+                continue
+            
+            content = bounded_text(content_el)
+            if not content or len(content) < 10:
+                continue
+            
+            # Get author
+            author = "unknown"
+            auth_el = find_first(tweet, AUTHOR_FINDERS)
+            if auth_el:
+                author = auth_el.get_text(strip=True).replace("@", "")
+            
+            # Get link
+            link_el = tweet.find("a", href=True)
+            link = link_el.get("href", "") if link_el else ""
+            if link and not link.startswith("http"):
+                link = base + link
+            
+            # Get timestamp if available
+            # Fallback id when no status link is found; pages are parsed
+            # concurrently, so a per-page counter could collide
+            tweet_id = f"twitter_{uuid.uuid4().hex}"
+            time_el = find_first(tweet, TIME_FINDERS)
+            if time_el and not time_el.get("href"):
+                # nitter wraps the status link inside span.tweet-date
+                time_el = time_el.find("a", href=True)
+            if time_el:
+                status_id = time_el["href"].split("#")[0].rstrip("/").split("/")[-1]
+                if status_id:
+                    tweet_id = f"twitter_{status_id}"
+            
+            posts.append({
+                "post_id": tweet_id,
+                "company": company,
+                "platform": "twitter",
+                "author_username": author,
+                "content": content,
+                "posted_at": scraped_at,
+                "url": link,
+            })
+            
+            found_tweets = True
+            if len(posts) >= limit:
+                break
+        
+        if found_tweets:
+            break
     
-    try:
-        r = requests.get(url, headers=headers, timeout=15)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
+    if not found_tweets:
+        logger.warning(f"No tweets found with any selector on {base}")
+    
+    return posts
+
+async def scrape_twitter(query: str, company: str, limit: int = 200, since_date: datetime = None,
+                         session: Optional[aiohttp.ClientSession] = None,
+                         on_page: Optional[Callable[[List[Dict]], Awaitable[None]]] = None) -> List[Dict]:
+    """
+    Scrape one nitter search results page for `query`.
+    
+    With `on_page`, the parsed page is awaited into it instead of being returned.
+    """
+    posts = []
+    
+    async with client_session(session) as http:
+        try:
+            base = await get_working_nitter(http)
+        except Exception as e:
+            logger.error(f"No working nitter instances: {e}")
+            return posts
         
-        # Try multiple selectors for tweets
-        tweet_selectors = [
-            "div.tweet",
-            "div.timeline-item",
-            "article",
-            "div.status"
-        ]
+        url = f"{base}/search?f=tweets&q={quote_plus(query)}&since=&until=&near="
         
-        found_tweets = False
-        for selector in tweet_selectors:
-            for tweet in soup.select(selector):
-                # Try multiple selectors for tweet content
-                content_selectors = [
-                    ".tweet-content",
-                    ".status-content",
-                    "div.e-content",
-                    "p",
-                    ".tweet-text"
-                ]
-                
-                content_el = None
-                for content_sel in content_selectors:
-                    content_el = tweet.select_one(content_sel)
-                    if content_el:
-                        break
-                
-                if not content_el:
-                    continue
-                
-                content = content_el.get_text(strip=True)
-                if not content or len(content) < 10:
-                    continue
-                
-                # Get author
-                author = "unknown"
-                author_selectors = [
-                    ".tweet-name",
-                    ".username",
-                    ".author",
-                    "strong.fullname",
-                    "span.username"
-                ]
-                for auth_sel in author_selectors:
-                    auth_el = tweet.select_one(auth_sel)
-                    if auth_el:
-                        author = auth_el.get_text(strip=True).replace("@", "")
-                        break
-                
-                # Get link
-                link_el = tweet.find("a", href=True)
-                link = link_el.get("href", "") if link_el else ""
-                if link and not link.startswith("http"):
-                    link = base + link
-                
-                # Get timestamp if available
-                tweet_id = f"twitter_{len(posts)}_{int(time.time()*1e6)}"
-                time_el = tweet.select_one(".time", "span.tweet-date", "a.tweet-link")
-                if time_el and time_el.get("href"):
-                    tweet_id = f"twitter_{time_el.get('href', '').split('/')[-1]}"
-                
-                posts.append({
-                    "post_id": tweet_id,
-                    "company": company,
-                    "platform": "twitter",
-                    "author_username": author,
-                    "content": content[:2000],
-                    "posted_at": datetime.utcnow(),
-                    "url": link,
-                })
-                
-                found_tweets = True
-                if len(posts) >= limit:
-                    break
+        try:
+            await HOST_LIMITER.wait(url)
+            async with http.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT) as r:
+                r.raise_for_status()
+                html = await read_page(r)
             
-            if found_tweets:
-                break
-        
-        if not found_tweets:
-            logger.warning(f"No tweets found with any selector on {base}")
-                
-    except Exception as e:
-        logger.error(f"Twitter scrape failed: {e}")
+            # BeautifulSoup parsing is CPU-bound; keep it off the event loop
+            posts = await asyncio.get_running_loop().run_in_executor(
+                None, _parse_twitter_page, html, base, company, limit
+            )
+        except Exception as e:
+            # Don't keep sending searches to an instance that just failed
+            _nitter_cache["url"] = None
+            logger.error(f"Twitter scrape failed: {e}")
     
     logger.info(f"Scraped {len(posts)} Twitter posts for {company}")
-    return posts
\ No newline at end of file
+    if on_page is not None:
+        if posts:
+            await on_page(posts)
+        return []
+    return posts
@@ -3,8 +3,28 @@ Great Expectations validation for data quality checks.
 """
 
 import numpy as np
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Set
+
+EMBEDDING_DIM = 384
+
+def _invalid_embedding_rows(embeddings: List[Any]) -> Set[int]:
+    """
+    Return the indices of embeddings that are not 384-float vectors.
+    
+    Stacks everything into one float32 array first; only when that fails or
+    comes out the wrong shape are the rows checked one by one.
+    """
+    try:
+        stacked = np.asarray(embeddings, dtype=np.float32)
+        if stacked.ndim == 2 and stacked.shape[1] == EMBEDDING_DIM:
+            return set()
+    except (ValueError, TypeError):
+        pass
+    
+    return {
+        i for i, embedding in enumerate(embeddings)
+        if not isinstance(embedding, (list, np.ndarray)) or len(embedding) != EMBEDDING_DIM
+    }
 
 class DataQualityValidator:
     """Data quality validation using Great Expectations principles."""
@@ -21,6 +41,11 @@ class DataQualityValidator:
         required_fields = ['post_id', 'post_text_cleaned', 'engagement_score', 
                           'post_embedding', 'source_type']
         
+        embedded = [i for i, post in enumerate(posts) if 'post_embedding' in post]
+        invalid_embeddings = {
+            embedded[j] for j in _invalid_embedding_rows([posts[i]['post_embedding'] for i in embedded])
+        }
+        
         for i, post in enumerate(posts):
             # Check required fields
             for field in required_fields:
@@ -37,11 +62,9 @@ class DataQualityValidator:
                 results['passed'] = False
                 results['errors'].append(f"Post {i}: engagement_score must be numeric")
             
-            if 'post_embedding' in post:
-                embedding = post['post_embedding']
-                if not isinstance(embedding, list) or len(embedding) != 384:
-                    results['passed'] = False
-                    results['errors'].append(f"Post {i}: post_embedding must be array of 384 floats")
+            if i in invalid_embeddings:
+                results['passed'] = False
+                results['errors'].append(f"Post {i}: post_embedding must be array of 384 floats")
             
             if 'source_type' in post and post['source_type'] not in ['Customer', 'Competitor', 'Reviewer']:
                 results['passed'] = False
@@ -59,33 +82,39 @@ class DataQualityValidator:
             'metrics': {}
         }
         
+        # Single pass over the posts for nulls and engagement
+        null_text_count = 0
+        engagement_scores = np.empty(len(posts), dtype=np.float64)
+        sources = set()
+        for i, post in enumerate(posts):
+            if not post.get('post_text_cleaned'):
+                null_text_count += 1
+            engagement_scores[i] = post.get('engagement_score', 0)
+            sources.add(post.get('source_type'))
+        
         # Check for null values
-        null_text_count = sum(1 for post in posts if not post.get('post_text_cleaned'))
         if null_text_count / len(posts) > 0.01:  # More than 1% null
             results['passed'] = False
             results['errors'].append(f"Too many null post_text_cleaned: {null_text_count}/{len(posts)}")
         
         # Check embedding dimensions
-        invalid_embeddings = sum(1 for post in posts 
-                                if not isinstance(post.get('post_embedding'), list) 
-                                or len(post.get('post_embedding', [])) != 384)
+        invalid_embeddings = len(_invalid_embedding_rows([post.get('post_embedding') for post in posts]))
         if invalid_embeddings > 0:
             results['passed'] = False
             results['errors'].append(f"Invalid embedding dimensions: {invalid_embeddings} posts")
         
         # Check engagement score ranges
-        engagement_scores = [post.get('engagement_score', 0) for post in posts]
-        if engagement_scores:
-            max_engagement = max(engagement_scores)
+        if engagement_scores.size:
+            max_engagement = engagement_scores.max()
             if max_engagement > 10000000:  # Business rule: no post should have >10M engagement
                 results['warnings'].append(f"Suspiciously high engagement score: {max_engagement}")
         
         # Calculate metrics
         results['metrics'] = {
             'total_posts': len(posts),
-            'avg_engagement': np.mean(engagement_scores) if engagement_scores else 0,
+            'avg_engagement': engagement_scores.mean() if engagement_scores.size else 0,
             'null_text_percentage': (null_text_count / len(posts)) * 100,
-            'unique_sources': len(set(post.get('source_type') for post in posts))
+            'unique_sources': len(sources)
         }
         
         return results
@@ -100,13 +129,21 @@ class DataQualityValidator:
             'metrics': {}
         }
         
-        # Check cosine similarity range
-        similarity_scores = [result.get('cosine_similarity_score', 0) for result in similarity_results]
+        # Check cosine similarity range; non-numeric scores become NaN and fail the check
+        similarity_scores = np.fromiter(
+            (score if isinstance(score, (int, float)) else np.nan
+             for score in (result.get('cosine_similarity_score', 0) for result in similarity_results)),
+            dtype=np.float64,
+            count=len(similarity_results)
+        )
         
-        for i, score in enumerate(similarity_scores):
-            if not isinstance(score, (int, float)) or score < -1.0 or score > 1.0:
-                results['passed'] = False
-                results['errors'].append(f"Result {i}: cosine_similarity_score must be between -1.0 and 1.0")
+        out_of_range = ~((similarity_scores >= -1.0) & (similarity_scores <= 1.0))
+        if out_of_range.any():
+            results['passed'] = False
+            results['errors'].extend(
+                f"Result {i}: cosine_similarity_score must be between -1.0 and 1.0"
+                for i in np.flatnonzero(out_of_range)
+            )
         
         # Check referential integrity
         post_ids = [result.get('post_id') for result in similarity_results]
@@ -117,9 +154,9 @@ class DataQualityValidator:
         # Calculate metrics
         results['metrics'] = {
             'total_results': len(similarity_results),
-            'avg_similarity': np.mean(similarity_scores) if similarity_scores else 0,
-            'max_similarity': max(similarity_scores) if similarity_scores else 0,
-            'min_similarity': min(similarity_scores) if similarity_scores else 0
+            'avg_similarity': similarity_scores.mean() if similarity_scores.size else 0,
+            'max_similarity': similarity_scores.max() if similarity_scores.size else 0,
+            'min_similarity': similarity_scores.min() if similarity_scores.size else 0
         }
         
         return results
@@ -0,0 +1,24 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+class HostRateLimiter:
+    """Space out requests to the same host without blocking requests to other hosts."""
+    
+    def __init__(self, requests_per_second: float = 1.0):
+        self._interval = 1.0 / requests_per_second
+        self._next_slot = {}
+    
+    async def wait(self, url: str) -> None:
+        """Sleep until the next request slot for the URL's host comes up."""
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        # Reserve the slot before sleeping; the event loop is single-threaded,
+        # so no lock is needed between the read and the write
+        slot = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# Shared by every scraper so politeness holds across companies and sources
+HOST_LIMITER = HostRateLimiter()
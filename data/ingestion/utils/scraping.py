@@ -0,0 +1,73 @@
+import contextlib
+import logging
+from typing import AsyncIterator, Iterable, Dict, Any, Optional
+import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+logger = logging.getLogger(__name__)
+
+# Search result pages past this size are truncated; the posts we keep are at the top
+MAX_PAGE_BYTES = 4 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+MAX_CONTENT_CHARS = 2000
+
+def parse_html(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse with lxml, falling back to the slower but more lenient html.parser if lxml fails."""
+    try:
+        return BeautifulSoup(html, "lxml", parse_only=parse_only)
+    except Exception as e:
+        logger.warning(f"lxml failed to parse page, retrying with html.parser: {e}")
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+def find_first(el: Tag, finders: Iterable[Dict[str, Any]]) -> Optional[Tag]:
+    """
+    Return the first match for the highest-priority finder that matches anything.
+    
+    Args:
+        el: Element to search under
+        finders: find() keyword arguments, in priority order
+    """
+    for kwargs in finders:
+        found = el.find(**kwargs)
+        if found:
+            return found
+    return None
+
+def bounded_text(el: Tag, max_chars: int = MAX_CONTENT_CHARS) -> str:
+    """Same as el.get_text(strip=True)[:max_chars], without joining text past the limit."""
+    parts = []
+    total = 0
+    for piece in el.stripped_strings:
+        parts.append(piece)
+        total += len(piece)
+        if total >= max_chars:
+            break
+    return "".join(parts)[:max_chars]
+
+async def read_page(response: aiohttp.ClientResponse, max_bytes: int = MAX_PAGE_BYTES) -> str:
+    """
+    Stream a response body in chunks and decode at most `max_bytes` of it.
+    
+    Keeps memory per page bounded however large the search page is; lxml
+    parses the truncated document without complaint.
+    """
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(READ_CHUNK_BYTES):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    return b"".join(chunks)[:max_bytes].decode(response.charset or "utf-8", errors="replace")
+
+@contextlib.asynccontextmanager
+async def client_session(session: Optional[aiohttp.ClientSession] = None) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yield the caller's session so connections are reused across scrapes, or
+    open (and close) a private one when none is given.
+    """
+    if session is not None:
+        yield session
+    else:
+        async with aiohttp.ClientSession() as own_session:
+            yield own_session
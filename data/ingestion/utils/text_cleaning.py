@@ -1,6 +1,14 @@
+import functools
 import re
 import html
-from typing import Dict, Any
+from typing import Optional
+import xxhash
+
+# Compiled once at import; clean_text runs for every scraped post
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_DISALLOWED_RE = re.compile(r'[^\w\s.,!?]')
+
+REVIEWER_INDICATORS = ('review', 'impression', 'hands on', 'unboxing', 'test', 'vs', 'comparison')
 
 def clean_text(raw_text: str) -> str:
     """
@@ -15,24 +23,13 @@ def clean_text(raw_text: str) -> str:
     if not raw_text:
         return ""
     
-    text = raw_text
-    
-    # Remove URLs
-    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-    
-    # Remove HTML entities
-    text = html.unescape(text)
-    
-    # Remove emojis and special unicode characters
-    text = re.sub(r'[^\w\s#@.,!?\'-]', '', text)
-    
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Remove extra punctuation but keep basic sentence structure
-    text = re.sub(r'[^\w\s.,!?]', '', text)
+    # Remove URLs, then HTML entities
+    text = html.unescape(_URL_RE.sub('', raw_text))
     
-    return text
+    # Remove emojis, special unicode characters and extra punctuation,
+    # keeping basic sentence structure; split/join normalizes whitespace
+    # and strips the ends in C without another regex pass
+    return ' '.join(_DISALLOWED_RE.sub('', text).split())
 
 def calculate_engagement_score(likes: int = 0, shares: int = 0, comments: int = 0) -> float:
     """
@@ -50,6 +47,11 @@ def calculate_engagement_score(likes: int = 0, shares: int = 0, comments: int =
     """
     return (0.2 * likes) + (0.3 * shares) + (0.5 * comments)
 
+@functools.lru_cache(maxsize=32)
+def _lowered_keywords(company_keywords: tuple) -> tuple:
+    """Lowercase the competitor names once per keyword list rather than once per post"""
+    return tuple(company.lower() for company in company_keywords)
+
 def classify_source_type(author: str, content: str, company_keywords: list) -> str:
     """
     Classify source type based on author and content analysis.
@@ -62,39 +64,42 @@ def classify_source_type(author: str, content: str, company_keywords: list) -> s
     Returns:
         Source type: 'Customer', 'Competitor', or 'Reviewer'
     """
-    author_lower = author.lower()
-    content_lower = content.lower()
-    
     # Check if it's a competitor official account
-    for company in company_keywords:
-        if company.lower() in author_lower or f"official{company.lower()}" in author_lower:
-            return 'Competitor'
+    # ("official<company>" always contains "<company>", so one test covers both)
+    author_lower = author.lower()
+    if any(company in author_lower for company in _lowered_keywords(tuple(company_keywords))):
+        return 'Competitor'
     
     # Check if it's a reviewer/influencer
-    reviewer_indicators = ['review', 'impression', 'hands on', 'unboxing', 'test', 'vs', 'comparison']
-    if any(indicator in content_lower for indicator in reviewer_indicators):
+    content_lower = content.lower()
+    if any(indicator in content_lower for indicator in REVIEWER_INDICATORS):
         return 'Reviewer'
     
     # Default to customer
     return 'Customer'
 
-def deduplicate_posts(posts: list) -> list:
+def deduplicate_posts(posts: list, seen_hashes: Optional[set] = None, field: str = 'content') -> list:
     """
     Remove duplicate posts based on content similarity.
     
     Args:
         posts: List of post dictionaries
+        seen_hashes: Content hashes from earlier batches; updated in place so
+            duplicates are caught across batches too
+        field: Post key whose text is compared
         
     Returns:
         Deduplicated list of posts
     """
-    seen_hashes = set()
+    if seen_hashes is None:
+        seen_hashes = set()
     unique_posts = []
     
     for post in posts:
-        # Create content hash for exact duplicate detection
-        content = post.get('content', '')
-        content_hash = hash(content.lower().strip())
+        # Create content hash for exact duplicate detection; case-folding the
+        # UTF-8 bytes is cheaper than str.lower() (ASCII letters only)
+        content = post.get(field, '')
+        content_hash = xxhash.xxh3_64_intdigest(content.encode('utf-8', 'ignore').lower().strip())
         
         if content_hash not in seen_hashes:
             seen_hashes.add(content_hash)
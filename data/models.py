@@ -1,11 +1,14 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+import numpy as np
 
 class SourceType(str, Enum):
     CUSTOMER = "customer"
     COMPETITOR = "competitor"
+    REVIEWER = "reviewer"
 
 class BronzePost(BaseModel):
     """Raw data model for social media posts in the Bronze layer."""
@@ -18,15 +21,44 @@ class BronzePost(BaseModel):
     created_at: datetime
     raw_metadata: Dict[str, Any] = Field(default_factory=dict)
 
-class SilverPost(BaseModel):
-    """Processed data model for social media posts in the Silver layer."""
+class SilverPostMeta(BaseModel):
+    """Silver layer post without its embedding; see SilverBatch."""
     post_id: str
     post_text_cleaned: str
     engagement_score: float
-    post_embedding: List[float]
     source_type: SourceType
     created_at: datetime
 
+class SilverPost(SilverPostMeta):
+    """Processed data model for social media posts in the Silver layer."""
+    post_embedding: List[float]
+
+@dataclass
+class SilverBatch:
+    """Silver posts with their embeddings held side by side as one (N, 384) float32 array."""
+    posts: List[SilverPostMeta]
+    embeddings: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.posts)
+    
+    @classmethod
+    def from_posts(cls, posts: List[SilverPost]) -> "SilverBatch":
+        """Split SilverPosts into metadata and a single embedding matrix."""
+        return cls(
+            posts=[
+                SilverPostMeta(
+                    post_id=post.post_id,
+                    post_text_cleaned=post.post_text_cleaned,
+                    engagement_score=post.engagement_score,
+                    source_type=post.source_type,
+                    created_at=post.created_at
+                )
+                for post in posts
+            ],
+            embeddings=np.asarray([post.post_embedding for post in posts], dtype=np.float32).reshape(-1, 384)
+        )
+
 class GoldInsight(BaseModel):
     """Aggregated insights in the Gold layer."""
     query_text: str
@@ -34,7 +34,7 @@ CREATE TABLE IF NOT EXISTS silver.social_posts_clean (
 	content TEXT NOT NULL,
 	posted_at TIMESTAMPTZ,
 	sentiment_score NUMERIC,
-	embedding VECTOR(384),           	-- 384-dim for all-MiniLM-L6-v2
+	embedding HALFVEC(384),          	-- 384-dim fp16 for all-MiniLM-L6-v2 (pgvector >= 0.7)
 	_ingested_at TIMESTAMPTZ DEFAULT NOW(),
 	_quality_score NUMERIC DEFAULT 100
 );
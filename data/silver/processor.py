@@ -1,19 +1,32 @@
-from typing import List, Dict, Any, Optional, Tuple
+import re
+from collections import Counter
+from typing import List, Dict, Any, Tuple, Union
 import numpy as np
 from datetime import datetime
-from ..models import SilverPost, GoldInsight, MarketingInsights, SourceType
+from sqlalchemy import text
+from ..vector_search import ef_search_sql
+from ..models import SilverPost, SilverPostMeta, SilverBatch, GoldInsight, MarketingInsights, SourceType
+
+TOPIC_WORD_RE = re.compile(r'\b\w{3,}\b')
+TOPIC_STOPWORDS = frozenset({
+    'the', 'and', 'for', 'with', 'this', 'that', 'was', 'were', 'are', 'you',
+    'your', 'have', 'has', 'had', 'they', 'their'
+})
 
 class SilverToGoldProcessor:
     """Process data from Silver to Gold layer with semantic search and insights."""
     
-    def __init__(self, embedding_model):
+    def __init__(self, embedding_model, engine=None):
         self.embedding_model = embedding_model
+        # SQLAlchemy engine for the silver table, used by fetch_candidate_posts
+        self.engine = engine
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors."""
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
+        vec1 = np.asarray(vec1)
+        vec2 = np.asarray(vec2)
+        # vdot goes straight to BLAS, skipping np.linalg.norm's dtype/axis handling
+        return float(np.dot(vec1, vec2) / np.sqrt(np.vdot(vec1, vec1) * np.vdot(vec2, vec2)))
     
     def generate_query_embedding(self, query: str) -> List[float]:
         """Generate embedding for the search query."""
@@ -21,37 +34,87 @@ class SilverToGoldProcessor:
         # For now, return a dummy 384-dim vector
         return [0.0] * 384
     
+    def _connect(self):
+        """Open a connection on the configured engine."""
+        if self.engine is None:
+            raise RuntimeError("SilverToGoldProcessor was created without an engine; pass engine= to query the silver table")
+        return self.engine.connect()
+    
+    def fetch_candidate_posts(self, engagement_threshold: float = 0.0) -> SilverBatch:
+        """
+        Load silver posts at or above the engagement threshold.
+        
+        The cutoff is applied by Postgres (backed by silver_posts_engagement_idx),
+        so low-engagement rows and their embeddings never leave the database.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(text("""
+                SELECT post_id, post_text_cleaned, engagement_score,
+                       lower(source_type) AS source_type, created_at,
+                       post_embedding::real[] AS post_embedding
+                FROM silver.social_posts_cleaned_features
+                WHERE engagement_score >= :threshold
+                AND post_embedding IS NOT NULL
+            """), {"threshold": engagement_threshold}).mappings().all()
+        
+        # Silver stores 'Customer'/'Competitor'/'Reviewer'; the lowercased values
+        # are SourceType members. Embeddings land in one float32 matrix.
+        return SilverBatch(
+            posts=[
+                SilverPostMeta(
+                    post_id=row["post_id"],
+                    post_text_cleaned=row["post_text_cleaned"],
+                    engagement_score=row["engagement_score"],
+                    source_type=row["source_type"],
+                    created_at=row["created_at"]
+                )
+                for row in rows
+            ],
+            embeddings=np.asarray([row["post_embedding"] for row in rows], dtype=np.float32).reshape(-1, 384)
+        )
+    
     def find_similar_posts(
         self,
         query: str,
-        posts: List[SilverPost],
+        posts: Union[SilverBatch, List[SilverPost]],
         top_k: int = 10,
         min_similarity: float = 0.0,
         engagement_threshold: float = 0.0
     ) -> List[Dict[str, Any]]:
         """Find posts similar to the query using vector similarity."""
-        query_embedding = self.generate_query_embedding(query)
+        if not posts:
+            return []
+        batch = self._as_batch(posts)
+        
+        query_embedding = np.asarray(self.generate_query_embedding(query), dtype=np.float32)
+        query_norm = np.linalg.norm(query_embedding)
+        if query_norm == 0:
+            return []
         
-        # Calculate similarities
-        similarities = []
-        for post in posts:
-            if post.engagement_score < engagement_threshold:
-                continue
-                
-            similarity = self.cosine_similarity(query_embedding, post.post_embedding)
-            if similarity >= min_similarity:
-                similarities.append((similarity, post))
+        # One mat-vec product instead of a cosine_similarity call per post;
+        # zero-norm posts come out as NaN and fail the threshold like before
+        matrix, engagement = self._embedding_matrix(batch)
+        similarities = matrix @ (query_embedding / query_norm)
+        candidates = np.flatnonzero(
+            (engagement >= engagement_threshold) & (similarities >= min_similarity)
+        )
         
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[0], reverse=True)
+        # Partition out the top-k, then sort just those (descending, ties by position)
+        k = min(top_k, candidates.size)
+        if k <= 0:
+            return []
+        if k < candidates.size:
+            candidates = candidates[np.argpartition(-similarities[candidates], k - 1)[:k]]
+        candidates = candidates[np.lexsort((candidates, -similarities[candidates]))]
         
         # Return top-k results
         results = []
-        for similarity, post in similarities[:top_k]:
+        for i in candidates:
+            post = batch.posts[i]
             results.append({
                 "post_id": post.post_id,
                 "post_text": post.post_text_cleaned,
-                "similarity_score": similarity,
+                "similarity_score": float(similarities[i]),
                 "engagement_score": post.engagement_score,
                 "source_type": post.source_type,
                 "created_at": post.created_at.isoformat()
@@ -59,10 +122,75 @@ class SilverToGoldProcessor:
         
         return results
     
+    def find_similar_posts_db(
+        self,
+        query: str,
+        top_k: int = 10,
+        min_similarity: float = 0.0,
+        engagement_threshold: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Find posts similar to the query with pgvector's HNSW index on the silver
+        table instead of scanning every post in Python.
+        """
+        query_embedding = np.asarray(self.generate_query_embedding(query), dtype=np.float32)
+        if not np.any(query_embedding):
+            return []
+        query_literal = "[" + ",".join(map(str, query_embedding.tolist())) + "]"
+        
+        with self._connect() as conn:
+            # The HNSW candidate list has to be at least as long as the LIMIT
+            conn.execute(text(ef_search_sql(top_k)))
+            rows = conn.execute(text("""
+                WITH nearest AS (
+                    SELECT post_id, post_text_cleaned, engagement_score, source_type, created_at,
+                           1 - (post_embedding <=> CAST(:query AS halfvec(384))) AS similarity_score
+                    FROM silver.social_posts_cleaned_features
+                    WHERE engagement_score >= :engagement_threshold
+                    ORDER BY post_embedding <=> CAST(:query AS halfvec(384))
+                    LIMIT :top_k
+                )
+                SELECT * FROM nearest
+                WHERE similarity_score >= :min_similarity
+                ORDER BY similarity_score DESC
+            """), {
+                "query": query_literal,
+                "engagement_threshold": engagement_threshold,
+                "min_similarity": min_similarity,
+                "top_k": top_k
+            }).mappings().all()
+        
+        return [{
+            "post_id": row["post_id"],
+            "post_text": row["post_text_cleaned"],
+            "similarity_score": float(row["similarity_score"]),
+            "engagement_score": row["engagement_score"],
+            "source_type": row["source_type"],
+            "created_at": row["created_at"].isoformat()
+        } for row in rows]
+    
+    def _as_batch(self, posts: Union[SilverBatch, List[SilverPost]]) -> SilverBatch:
+        """Return posts as a SilverBatch, converting a SilverPost list."""
+        return posts if isinstance(posts, SilverBatch) else SilverBatch.from_posts(posts)
+    
+    def _embedding_matrix(self, batch: SilverBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the (N, 384) unit-norm float32 embedding matrix and engagement scores for a batch.
+        Rebuilt on every call: posts and batches are mutable, so nothing is cached across searches.
+        """
+        # Copy so normalizing never writes through to the caller's embeddings
+        matrix = np.array(batch.embeddings, dtype=np.float32, order="C")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        engagement = np.fromiter(
+            (p.engagement_score for p in batch.posts), dtype=np.float64, count=len(batch)
+        )
+        return matrix, engagement
+    
     def generate_marketing_insights(
         self,
         query: str,
-        posts: List[SilverPost],
+        posts: Union[SilverBatch, List[SilverPost]],
         top_k: int = 10,
         similarity_threshold: float = 0.8
     ) -> MarketingInsights:
@@ -74,9 +202,10 @@ class SilverToGoldProcessor:
                 top_performing_topics=[],
                 engagement_metrics={"avg_engagement": 0.0, "max_engagement": 0.0}
             )
+        batch = self._as_batch(posts)
         
         # Get engagement scores for threshold calculation
-        engagement_scores = [p.engagement_score for p in posts]
+        engagement_scores = [p.engagement_score for p in batch.posts]
         avg_engagement = sum(engagement_scores) / len(engagement_scores)
         max_engagement = max(engagement_scores)
         
@@ -87,7 +216,7 @@ class SilverToGoldProcessor:
         # Find similar posts
         similar_posts = self.find_similar_posts(
             query=query,
-            posts=posts,
+            posts=batch,
             top_k=top_k * 2,  # Get more posts to filter
             min_similarity=similarity_threshold
         )
@@ -112,7 +241,7 @@ class SilverToGoldProcessor:
                 content_gaps.append(insight)
         
         # Get top performing topics (simplified example)
-        top_topics = self._extract_top_topics(posts, top_n=5)
+        top_topics = self._extract_top_topics(batch.posts, top_n=5)
         
         return MarketingInsights(
             high_value_content=high_value[:top_k],
@@ -126,23 +255,19 @@ class SilverToGoldProcessor:
             }
         )
     
-    def _extract_top_topics(self, posts: List[SilverPost], top_n: int = 5) -> List[Dict[str, Any]]:
+    def _extract_top_topics(self, posts: List[SilverPostMeta], top_n: int = 5) -> List[Dict[str, Any]]:
         """Extract top performing topics from posts (simplified example)."""
         # In a real implementation, you would use topic modeling (e.g., LDA, BERTopic)
         # This is a simplified version that just looks at word frequencies
-        from collections import defaultdict
-        import re
         
-        # Simple word frequency analysis
-        word_counts = defaultdict(int)
-        for post in posts:
-            words = re.findall(r'\b\w{3,}\b', post.post_text_cleaned.lower())
-            for word in words:
-                if word not in {'the', 'and', 'for', 'with', 'this', 'that', 'was', 'were', 'are', 'you', 'your', 'have', 'has', 'had', 'they', 'their'}:
-                    word_counts[word] += 1
+        # Simple word frequency analysis, with one regex scan over all posts
+        text = "\n".join(post.post_text_cleaned for post in posts).lower()
+        word_counts = Counter(
+            word for word in TOPIC_WORD_RE.findall(text) if word not in TOPIC_STOPWORDS
+        )
         
         # Get top N words by frequency
-        top_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
+        top_words = word_counts.most_common(top_n)
         
         # Format as topics (in a real implementation, this would be more sophisticated)
         return [{"topic": word, "count": count} for word, count in top_words]
@@ -0,0 +1,10 @@
+"""pgvector query settings shared by the silver and gold similarity searches."""
+
+# HNSW candidate list size for ANN searches; raised to the LIMIT when that is larger
+HNSW_EF_SEARCH = 64
+# pgvector rejects hnsw.ef_search above 1000
+HNSW_EF_SEARCH_MAX = 1000
+
+def ef_search_sql(limit: int) -> str:
+    """SET LOCAL statement sizing the HNSW candidate list for a LIMIT"""
+    return f"SET LOCAL hnsw.ef_search = {min(max(HNSW_EF_SEARCH, int(limit)), HNSW_EF_SEARCH_MAX)}"